@@ -0,0 +1,256 @@
+import asyncio
+import io
+import logging
+import os
+from openai import AsyncOpenAI
+from elevenlabs import AsyncElevenLabs
+from script_generator import ScriptGenerator
+from paper_index import PaperIndex
+from metadata_generator import EpisodeMetadataGenerator
+from podcast_generator import PodcastGenerator
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncScriptGenerator(ScriptGenerator):
+    """An asyncio counterpart of ScriptGenerator that works on in-memory PDFs."""
+
+    def __init__(self, segment_delay=3, router=None):
+        """
+        Initialize the AsyncScriptGenerator with an async OpenAI client.
+
+        Args:
+            segment_delay (float): Seconds to wait between segments to avoid rate limits
+            router (ModelRouter, optional): Router that picks the model for each segment
+        """
+        # The async API works on in-memory inputs, so it gets an index that
+        # never touches paper_index.json
+        super().__init__(router, paper_index=PaperIndex(index_path=None))
+        self.async_client = AsyncOpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+        self.segment_delay = segment_delay
+
+    async def generate_segment(self, segment_name, word_count, pdf_content, conversation_history="", pdf_path=""):
+        """
+        Generate a specific segment of the podcast script.
+
+        Runs ScriptGenerator.segment_steps with the async client.
+
+        Args:
+            segment_name (str): Name of the segment to generate
+            word_count (int): Target word count for the segment
+            pdf_content (str): Content of the PDF
+            conversation_history (str): Previous conversation for context
+            pdf_path (str): Filename of the PDF, used for the closing topic
+
+        Returns:
+            str: Generated segment content
+        """
+        steps = self.segment_steps(segment_name, word_count, pdf_content, conversation_history, pdf_path)
+        try:
+            route_name, params, request = next(steps)
+            while True:
+                try:
+                    response = await self.router.acomplete(self.async_client, route_name, params, **request)
+                except Exception as e:
+                    route_name, params, request = steps.throw(e)
+                else:
+                    route_name, params, request = steps.send(response)
+        except StopIteration as done:
+            return done.value
+
+    def report(self, message):
+        """Report progress or a recoverable error through logging rather than stdout."""
+        logger.info(message)
+
+    async def generate_full_script(self, pdf_data, filename="", timeout=None):
+        """
+        Generate the complete podcast script from an in-memory PDF.
+
+        Args:
+            pdf_data (bytes): Raw PDF file contents
+            filename (str): Original PDF filename, used for the closing topic
+            timeout (float, optional): Overall time limit in seconds
+
+        Returns:
+            tuple: (complete_script, first_speaker)
+
+        Raises:
+            ValueError: If a segment could not be generated
+            asyncio.TimeoutError: If the script is not ready within timeout
+        """
+        return await asyncio.wait_for(self._generate_full_script(pdf_data, filename), timeout)
+
+    async def _generate_full_script(self, pdf_data, filename):
+        # PDF parsing is CPU-bound, keep it off the event loop
+        pdf_content = await asyncio.to_thread(self.extract_text_from_pdf, io.BytesIO(pdf_data))
+
+        complete_script = ""
+        conversation_history = ""
+
+        for i, (segment_name, info) in enumerate(self.segments.items()):
+            if i > 0 and self.segment_delay:
+                await asyncio.sleep(self.segment_delay)
+
+            segment_content = await self.generate_segment(
+                segment_name,
+                info["words"],
+                pdf_content,
+                conversation_history,
+                filename
+            )
+            if not segment_content:
+                raise ValueError(f"Segment '{segment_name}' could not be generated")
+
+            conversation_history += "\n" + self.extract_last_words(segment_content)
+            complete_script += f"\n\n{segment_content}\n"
+
+        return complete_script, self.detect_first_speaker(complete_script)
+
+
+class AsyncEpisodeMetadataGenerator(EpisodeMetadataGenerator):
+    """An asyncio counterpart of EpisodeMetadataGenerator that works on script text."""
+
+    def __init__(self, router=None):
+        """
+        Initialize the AsyncEpisodeMetadataGenerator with an async OpenAI client.
+
+        Args:
+            router (ModelRouter, optional): Router that picks the model for each task
+        """
+        super().__init__(router)
+        self.async_client = AsyncOpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+
+    async def generate_metadata(self, script_content, timeout=None):
+        """
+        Generate episode title and description from script text.
+
+        Args:
+            script_content (str): The full script content
+            timeout (float, optional): Overall time limit in seconds
+
+        Returns:
+            tuple: (title, description)
+
+        Raises:
+            asyncio.TimeoutError: If the metadata is not ready within timeout
+        """
+        return await asyncio.wait_for(self._generate_metadata(script_content), timeout)
+
+    async def _generate_metadata(self, script_content):
+        host_names = self.get_host_names(script_content)
+
+        response = await self.router.acomplete(
+            self.async_client, "Episode Title", **self._title_request(script_content, host_names)
+        )
+        title = self._clean_title(response.choices[0].message.content)
+
+        response = await self.router.acomplete(
+            self.async_client, "Episode Description", **self._description_request(script_content, title, host_names)
+        )
+        description = response.choices[0].message.content.strip()
+
+        return title, description
+
+
+class AsyncPodcastGenerator(PodcastGenerator):
+    """An asyncio counterpart of PodcastGenerator that returns audio as bytes or a stream."""
+
+    def __init__(self, max_concurrency=4):
+        """
+        Initialize the AsyncPodcastGenerator with an async ElevenLabs client.
+
+        Args:
+            max_concurrency (int): Maximum number of text-to-speech requests in flight
+        """
+        super().__init__(print_voices=False)
+        self.async_client = AsyncElevenLabs(api_key=os.getenv('ELEVENLABS_API_KEY'))
+        self.max_concurrency = max_concurrency
+
+    async def generate_audio_segment(self, text, voice_id):
+        """
+        Generate audio for a single segment of text.
+
+        Args:
+            text (str): Text to convert to speech
+            voice_id (str): Voice ID to use
+
+        Returns:
+            bytes: Generated audio data
+        """
+        try:
+            chunks = []
+            async for chunk in self.async_client.text_to_speech.convert(
+                text=text,
+                voice_id=voice_id,
+                model_id=self.model_id,
+                output_format=self.output_format
+            ):
+                chunks.append(chunk)
+            return b''.join(chunks)
+        except Exception as e:
+            logger.error("Error generating audio: %s", e)
+            return b''
+
+    async def stream_podcast(self, script_content, first_speaker="Alex"):
+        """
+        Stream podcast audio for a script, one speaker turn at a time.
+
+        Turns are synthesised concurrently, up to max_concurrency at once, and
+        yielded in script order. Closing the stream cancels pending requests.
+
+        Args:
+            script_content (str): The full script content
+            first_speaker (str): "Vic" or "Alex"
+
+        Yields:
+            bytes: Audio data for each speaker turn
+        """
+        second_speaker = "Alex" if first_speaker == "Vic" else "Vic"
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def synthesise(text, speaker):
+            async with semaphore:
+                return await self.generate_audio_segment(text, self.voice_ids[speaker])
+
+        tasks = [
+            asyncio.create_task(synthesise(segment, first_speaker if i % 2 == 0 else second_speaker))
+            for i, segment in enumerate(self.split_script(script_content))
+        ]
+        try:
+            for task in tasks:
+                audio_data = await task
+                if audio_data:
+                    yield audio_data
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def generate_podcast(self, script_content, first_speaker="Alex", timeout=None):
+        """
+        Generate podcast audio for a script.
+
+        Args:
+            script_content (str): The full script content
+            first_speaker (str): "Vic" or "Alex"
+            timeout (float, optional): Overall time limit in seconds
+
+        Returns:
+            bytes: The combined MP3 audio
+
+        Raises:
+            ValueError: If no audio segments were generated successfully
+            asyncio.TimeoutError: If the audio is not ready within timeout
+        """
+        return await asyncio.wait_for(self._generate_podcast(script_content, first_speaker), timeout)
+
+    async def _generate_podcast(self, script_content, first_speaker):
+        stream = self.stream_podcast(script_content, first_speaker)
+        try:
+            audio_segments = [audio_data async for audio_data in stream]
+        finally:
+            await stream.aclose()
+
+        if not audio_segments:
+            raise ValueError("No audio segments were generated successfully")
+
+        return b''.join(audio_segments)
@@ -3,6 +3,8 @@ import sys
 import re
 from dotenv import load_dotenv
 import openai
+from model_router import get_default_router
+from paper_index import get_default_index
 
 # Load environment variables
 load_dotenv()
@@ -10,8 +12,14 @@ load_dotenv()
 class EpisodeMetadataGenerator:
     """A class to generate episode title and description from a podcast script."""
     
-    def __init__(self):
-        """Initialize the EpisodeMetadataGenerator with OpenAI API key."""
+    def __init__(self, router=None):
+        """
+        Initialize the EpisodeMetadataGenerator with OpenAI API key.
+        
+        Args:
+            router (ModelRouter, optional): Router that picks the model for the
+                title and description. Defaults to the router shared across the process.
+        """
         # Initialize OpenAI API key
         api_key = os.getenv('OPENAI_API_KEY')
         if not api_key:
@@ -20,8 +28,8 @@ class EpisodeMetadataGenerator:
         # Set OpenAI API key
         openai.api_key = api_key
         
-        # Model to use for generation
-        self.model = "gpt-4o-mini"  # You can change this to gpt-3.5-turbo if needed
+        # Model and generation parameters are chosen per task
+        self.router = router or get_default_router()
     
     def extract_first_few_lines(self, script_content, num_lines=10):
         """Extract the first few lines of the script to get context."""
@@ -76,6 +84,11 @@ class EpisodeMetadataGenerator:
     
     def _generate_title(self, script_content, host_names):
         """Generate a catchy and informative title for the episode."""
+        response = self.router.complete(openai, "Episode Title", **self._title_request(script_content, host_names))
+        return self._clean_title(response.choices[0].message.content)
+    
+    def _title_request(self, script_content, host_names):
+        """Build the chat completion arguments for the episode title."""
         prompt = f"""
         Generate a podcast episode title based on the podcast script.
         The title should be catchy, clear to a general AI-interested audience, and capture the central idea of the episode.
@@ -89,20 +102,24 @@ class EpisodeMetadataGenerator:
         Title:
         """
         
-        response = openai.chat.completions.create(
-            model=self.model,
-            messages=[
+        return {
+            "messages": [
                 {"role": "system", "content": "You are a podcast producer creating engaging, clear titles for AI-focused content that balance technical accuracy with accessibility."},
                 {"role": "user", "content": prompt}
-            ],
-            max_tokens=50,
-            temperature=0.7
-        )
-        
-        return response.choices[0].message.content.strip().replace('"', '').replace("'", "")
+            ]
+        }
+    
+    def _clean_title(self, title):
+        """Strip whitespace and quotes from a generated title."""
+        return title.strip().replace('"', '').replace("'", "")
     
     def _generate_description(self, script_content, title, host_names):
         """Generate a compelling description for the episode."""
+        response = self.router.complete(openai, "Episode Description", **self._description_request(script_content, title, host_names))
+        return response.choices[0].message.content.strip()
+    
+    def _description_request(self, script_content, title, host_names):
+        """Build the chat completion arguments for the episode description."""
         prompt = f"""
         You are a podcast producer for "Talking Machines by SU PARK" podcast. 
         Based on the following script excerpt and title, generate a clear, concise description in exactly 2 paragraphs.
@@ -127,17 +144,12 @@ class EpisodeMetadataGenerator:
         Description:
         """
         
-        response = openai.chat.completions.create(
-            model=self.model,
-            messages=[
+        return {
+            "messages": [
                 {"role": "system", "content": "You are a podcast producer creating concise, factual descriptions without promotional language."},
                 {"role": "user", "content": prompt}
-            ],
-            max_tokens=300,
-            temperature=0.7
-        )
-        
-        return response.choices[0].message.content.strip()
+            ]
+        }
     
     def save_metadata(self, title, description, output_file=None):
         """
@@ -183,10 +195,18 @@ def main():
     script_file_path = os.path.join(script_dir, script_files[0])
     print(f"Using script file: {script_file_path}")
     
+    # Pass --force to regenerate metadata the paper index already links to
+    force = "--force" in sys.argv[1:]
+    existing = get_default_index().find_output(script_file_path, "metadata")
+    if existing and not force:
+        print(f"Metadata already exists for this paper: {existing} (pass --force to regenerate)")
+        return
+    
     # Determine output file path
     output_file = None
-    if len(sys.argv) > 1:
-        output_file = sys.argv[1]
+    args = [arg for arg in sys.argv[1:] if arg != "--force"]
+    if args:
+        output_file = args[0]
     else:
         # Create metadata directory if it doesn't exist
         metadata_dir = "metadata"
@@ -201,6 +221,7 @@ def main():
         print(f"Generating metadata for script: {script_file_path}")
         title, description = generator.generate_metadata(script_file_path)
         generator.save_metadata(title, description, output_file)
+        get_default_index().link_outputs(script_file_path, metadata_path=output_file)
     except Exception as e:
         print(f"Error: {str(e)}")
 
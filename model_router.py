@@ -0,0 +1,399 @@
+import os
+import json
+import time
+import random
+import atexit
+import asyncio
+
+# Prices in USD per million tokens: (input, output)
+MODEL_PRICES = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4.1-mini": (0.40, 1.60),
+    "gpt-4.1": (2.00, 8.00),
+}
+
+# Routes for each script segment and metadata task. Candidates are listed
+# best-first; the router picks the first one whose observed latency, cost
+# and failure rate fit the route's budget. Budgets only matter for routes
+# with more than one candidate.
+DEFAULT_ROUTES = {
+    "Introduction & Setup": {
+        "candidates": [
+            {"model": "gpt-4o-mini", "max_tokens": 3000, "temperature": 0.7, "top_p": 0.9}
+        ]
+    },
+    "Key Concepts Part 1": {
+        "candidates": [
+            {"model": "gpt-4o", "max_tokens": 3000, "temperature": 0.7, "top_p": 0.9},
+            {"model": "gpt-4o-mini", "max_tokens": 3000, "temperature": 0.7, "top_p": 0.9}
+        ],
+        "max_latency": 90,
+        "max_cost": 0.05
+    },
+    "Key Concepts Part 2": {
+        "candidates": [
+            {"model": "gpt-4o", "max_tokens": 3000, "temperature": 0.7, "top_p": 0.9},
+            {"model": "gpt-4o-mini", "max_tokens": 3000, "temperature": 0.7, "top_p": 0.9}
+        ],
+        "max_latency": 90,
+        "max_cost": 0.05
+    },
+    "Closing": {
+        "candidates": [
+            {"model": "gpt-4o-mini", "max_tokens": 3000, "temperature": 0.7, "top_p": 0.9}
+        ]
+    },
+    "Episode Title": {
+        "candidates": [
+            {"model": "gpt-4o-mini", "max_tokens": 50, "temperature": 0.7}
+        ]
+    },
+    "Episode Description": {
+        "candidates": [
+            {"model": "gpt-4o-mini", "max_tokens": 300, "temperature": 0.7}
+        ]
+    }
+}
+
+
+class ModelRouter:
+    """A class to pick a model and generation parameters for each script segment and metadata task."""
+
+    def __init__(self, routes=None, config_path="routing.json", stats_path="routing_stats.json"):
+        """
+        Initialize the ModelRouter with routes and previously observed stats.
+
+        Args:
+            routes (dict, optional): Routes to use instead of DEFAULT_ROUTES
+            config_path (str): JSON file whose routes override the defaults, if it exists
+            stats_path (str): JSON file where observed stats are persisted
+        """
+        self.routes = dict(routes or DEFAULT_ROUTES)
+        if config_path and os.path.exists(config_path):
+            with open(config_path, 'r', encoding='utf-8') as file:
+                self.routes.update(json.load(file))
+
+        # Observations needed before a candidate is judged against the budget
+        self.min_samples = 3
+        # Weight of the newest observation in the moving averages
+        self.smoothing = 0.2
+        self.max_failure_rate = 0.5
+        # Chance of re-probing an over-budget candidate, so a model that was
+        # skipped after a latency spike or outage can win its route back
+        self.exploration_rate = 0.1
+        self.random = random.Random()
+
+        # Stats are written at most once per save_interval seconds, and once
+        # more on exit
+        self.save_interval = 30
+        self.stats_path = stats_path
+        self.stats = self._load_stats() if stats_path else {}
+        self._dirty = set()
+        # Call and success counts of each entry as last read from or written
+        # to the stats file, so a save can tell new observations apart
+        self._baseline = {}
+        self._set_baseline(self.stats)
+        self._last_save = time.time()
+        atexit.register(self.save_stats)
+
+    def _load_stats(self):
+        """Read the stats file, returning an empty dict if it is missing or unreadable."""
+        if not os.path.exists(self.stats_path):
+            return {}
+        try:
+            with open(self.stats_path, 'r', encoding='utf-8') as file:
+                return json.load(file)
+        except (OSError, ValueError) as e:
+            print(f"Error loading routing stats: {e}")
+            return {}
+
+    def estimate_cost(self, model, prompt_tokens, completion_tokens):
+        """
+        Estimate the cost of a request.
+
+        Args:
+            model (str): Model name
+            prompt_tokens (float): Number of input tokens
+            completion_tokens (float): Number of output tokens
+
+        Returns:
+            float: Cost in USD, or 0 if the model has no known price
+        """
+        input_price, output_price = MODEL_PRICES.get(model, (0, 0))
+        return (prompt_tokens * input_price + completion_tokens * output_price) / 1_000_000
+
+    def _fits_budget(self, route, stats):
+        """Check a candidate's observed stats against the route's budget."""
+        if stats["failure_rate"] > route.get("max_failure_rate", self.max_failure_rate):
+            return False
+        # Latency and cost are unknown until the first successful call
+        if stats["latency"] is None:
+            return True
+        if "max_latency" in route and stats["latency"] > route["max_latency"]:
+            return False
+        if "max_cost" in route and stats["cost"] > route["max_cost"]:
+            return False
+        return True
+
+    def _budget_overrun(self, route, stats):
+        """Get how far a candidate is over the route's budget, as the largest ratio of observed to allowed."""
+        overrun = stats["failure_rate"] / route.get("max_failure_rate", self.max_failure_rate)
+        if stats["latency"] is not None:
+            if "max_latency" in route:
+                overrun = max(overrun, stats["latency"] / route["max_latency"])
+            if "max_cost" in route:
+                overrun = max(overrun, stats["cost"] / route["max_cost"])
+        return overrun
+
+    def choose(self, route_name):
+        """
+        Choose the model and generation parameters for a route.
+
+        Candidates without enough observations are tried as-is, and
+        over-budget candidates are occasionally re-probed. If no candidate
+        fits the budget, the one least over it is used.
+
+        Args:
+            route_name (str): Segment or metadata task name
+
+        Returns:
+            dict: Keyword arguments for chat.completions.create, including the model
+        """
+        route = self.routes[route_name]
+        route_stats = self.stats.get(route_name, {})
+
+        for candidate in route["candidates"]:
+            stats = route_stats.get(candidate["model"])
+            if stats is None or stats["calls"] < self.min_samples or self._fits_budget(route, stats):
+                return dict(candidate)
+            if self.random.random() < self.exploration_rate:
+                return dict(candidate)
+
+        def overrun(candidate):
+            return self._budget_overrun(route, route_stats[candidate["model"]])
+
+        return dict(min(route["candidates"], key=overrun))
+
+    def record(self, route_name, model, latency, prompt_tokens=0, completion_tokens=0, failed=False):
+        """
+        Record the outcome of a request.
+
+        Args:
+            route_name (str): Segment or metadata task name
+            model (str): Model that served the request
+            latency (float): Request duration in seconds
+            prompt_tokens (int): Number of input tokens
+            completion_tokens (int): Number of output tokens
+            failed (bool): Whether the request raised an error
+        """
+        stats = self.stats.setdefault(route_name, {}).setdefault(model, {
+            "calls": 0,
+            "successes": 0,
+            "failure_rate": 0.0,
+            "latency": None,
+            "prompt_tokens": None,
+            "completion_tokens": None,
+            "cost": None
+        })
+        a = self.smoothing
+
+        if stats["calls"] == 0:
+            stats["failure_rate"] = float(failed)
+        else:
+            stats["failure_rate"] = (1 - a) * stats["failure_rate"] + a * float(failed)
+        stats["calls"] += 1
+
+        # Failed requests say nothing about latency or token usage
+        if not failed:
+            observed = {
+                "latency": latency,
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "cost": self.estimate_cost(model, prompt_tokens, completion_tokens)
+            }
+            for key, value in observed.items():
+                if stats.get("successes", 0) == 0:
+                    stats[key] = value
+                else:
+                    stats[key] = (1 - a) * stats[key] + a * value
+            stats["successes"] = stats.get("successes", 0) + 1
+
+        self._dirty.add((route_name, model))
+
+    def _save_due(self):
+        """Check whether unsaved stats are older than save_interval."""
+        return self._dirty and time.time() - self._last_save >= self.save_interval
+
+    def _set_baseline(self, stats):
+        """Remember the call and success counts of entries read from or written to the stats file."""
+        for route_name, models in stats.items():
+            for model, entry in models.items():
+                self._baseline[(route_name, model)] = (entry["calls"], entry.get("successes", 0))
+
+    def _take_dirty(self):
+        """
+        Copy the entries changed since the last save and reset the dirty set.
+
+        Returns:
+            dict: (entry, baseline) pairs keyed by (route_name, model), where
+                baseline is the entry's (calls, successes) when last synced
+                with the stats file
+        """
+        entries = {}
+        for key in self._dirty:
+            entry = dict(self.stats[key[0]][key[1]])
+            entries[key] = (entry, self._baseline.get(key, (0, 0)))
+            self._baseline[key] = (entry["calls"], entry["successes"])
+        self._dirty = set()
+        self._last_save = time.time()
+        return entries
+
+    def _merge_entry(self, entry, baseline, on_disk):
+        """
+        Combine an entry changed here with the same entry changed by another process.
+
+        Both started from baseline, so each side's averages are weighted by
+        the calls (for failure rate) or successes (for latency, tokens and
+        cost) it observed since then.
+        """
+        base_calls, base_successes = baseline
+        new_calls = entry["calls"] - base_calls
+        other_calls = on_disk["calls"] - base_calls
+        new_successes = entry["successes"] - base_successes
+        other_successes = on_disk.get("successes", 0) - base_successes
+        if other_calls <= 0:
+            return entry
+
+        def weighted(ours, theirs, our_weight, their_weight):
+            if theirs is None or their_weight <= 0:
+                return ours
+            if ours is None or our_weight <= 0:
+                return theirs
+            return (ours * our_weight + theirs * their_weight) / (our_weight + their_weight)
+
+        merged = {
+            "calls": base_calls + new_calls + other_calls,
+            "successes": base_successes + new_successes + max(other_successes, 0),
+            "failure_rate": weighted(entry["failure_rate"], on_disk["failure_rate"], new_calls, other_calls)
+        }
+        for key in ("latency", "prompt_tokens", "completion_tokens", "cost"):
+            merged[key] = weighted(entry[key], on_disk.get(key), new_successes, other_successes)
+        return merged
+
+    def _write_stats(self, entries):
+        """
+        Merge changed entries into the stats file and write it atomically.
+
+        The file is re-read first so entries written by other processes
+        sharing it are kept. Where another process changed the same entry,
+        the two sets of observations are combined with _merge_entry.
+        """
+        stats = self._load_stats()
+        for (route_name, model), (entry, baseline) in entries.items():
+            models = stats.setdefault(route_name, {})
+            if model in models:
+                entry = self._merge_entry(entry, baseline, models[model])
+            models[model] = entry
+        try:
+            temp_path = f"{self.stats_path}.{os.getpid()}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as file:
+                json.dump(stats, file, indent=2)
+            os.replace(temp_path, self.stats_path)
+        except OSError as e:
+            print(f"Error saving routing stats: {e}")
+        return stats
+
+    def save_stats(self):
+        """Write unsaved stats to stats_path and pick up other processes' entries."""
+        if not self.stats_path or not self._dirty:
+            return
+        self._adopt_stats(self._write_stats(self._take_dirty()))
+
+    def _adopt_stats(self, merged):
+        """Take in entries from other processes, except ones changed here since the save."""
+        for route_name, models in merged.items():
+            for model, entry in models.items():
+                if (route_name, model) not in self._dirty:
+                    self.stats.setdefault(route_name, {})[model] = entry
+                    self._baseline[(route_name, model)] = (entry["calls"], entry.get("successes", 0))
+
+    def _record_response(self, route_name, model, start_time, response):
+        """Record a successful response's latency and token usage."""
+        usage = getattr(response, "usage", None)
+        self.record(
+            route_name,
+            model,
+            time.time() - start_time,
+            getattr(usage, "prompt_tokens", 0) or 0,
+            getattr(usage, "completion_tokens", 0) or 0
+        )
+
+    def complete(self, client, route_name, params=None, **request):
+        """
+        Send a chat completion request through the chosen route.
+
+        Args:
+            client: OpenAI client, or the openai module itself
+            route_name (str): Route the request's stats are recorded under
+            params (dict, optional): Model and generation parameters to use
+                instead of choosing them for route_name
+            **request: Request arguments such as messages; these override the
+                route's parameters
+
+        Returns:
+            The chat completion response
+        """
+        params = {**(params or self.choose(route_name)), **request}
+        start_time = time.time()
+        try:
+            response = client.chat.completions.create(**params)
+        except Exception:
+            self.record(route_name, params["model"], time.time() - start_time, failed=True)
+            raise
+        else:
+            self._record_response(route_name, params["model"], start_time, response)
+            return response
+        finally:
+            if self._save_due():
+                self.save_stats()
+
+    async def acomplete(self, client, route_name, params=None, **request):
+        """
+        Send a chat completion request through the chosen route with an async client.
+
+        Stats are saved in a worker thread so the event loop never blocks on disk.
+        See complete.
+        """
+        params = {**(params or self.choose(route_name)), **request}
+        start_time = time.time()
+        try:
+            response = await client.chat.completions.create(**params)
+        except Exception:
+            self.record(route_name, params["model"], time.time() - start_time, failed=True)
+            raise
+        else:
+            self._record_response(route_name, params["model"], start_time, response)
+            return response
+        finally:
+            if self._save_due():
+                merged = await asyncio.to_thread(self._write_stats, self._take_dirty())
+                self._adopt_stats(merged)
+
+
+_default_router = None
+
+def get_default_router():
+    """
+    Get the router shared by all generators in this process.
+
+    Sharing one router keeps a single copy of the stats, so generators do
+    not overwrite each other's observations in the stats file.
+
+    Returns:
+        ModelRouter: The shared router
+    """
+    global _default_router
+    if _default_router is None:
+        _default_router = ModelRouter()
+    return _default_router
@@ -0,0 +1,342 @@
+import os
+import re
+import json
+import uuid
+import hashlib
+import zlib
+
+# MinHash parameters. Signatures use one-permutation hashing: each shingle
+# hash is assigned to one of NUM_BINS bins and the minimum is kept per bin,
+# so a signature costs a single pass over the shingles. Signatures are split
+# into LSH bands of ROWS_PER_BAND bins; papers sharing a band are compared.
+NUM_BINS = 64
+ROWS_PER_BAND = 4
+SHINGLE_SIZE = 5
+_EMPTY_BIN = -1
+
+# Texts with fewer shingles than this (scanned PDFs, failed extractions)
+# carry too little signal to be matched against other papers
+MIN_SHINGLES = 100
+
+
+class PaperIndex:
+    """A persistent index of processed papers for detecting exact and near-duplicate PDFs."""
+
+    def __init__(self, index_path="paper_index.json", similarity_threshold=0.8):
+        """
+        Initialize the PaperIndex and load previously processed papers.
+
+        Args:
+            index_path (str): JSON file where the index is persisted
+            similarity_threshold (float): Estimated Jaccard similarity above
+                which two papers are treated as near duplicates
+        """
+        self.index_path = index_path
+        self.similarity_threshold = similarity_threshold
+        self.papers = []
+        self._loaded_mtime = None
+        # Entries changed since the last save, keyed by id
+        self._dirty = {}
+
+        if index_path:
+            self._set_papers(self._load_papers())
+
+    def _index_mtime(self):
+        """Get the modification time of the index file, or None if it does not exist."""
+        try:
+            return os.path.getmtime(self.index_path)
+        except OSError:
+            return None
+
+    def _load_papers(self):
+        """Read the papers list from the index file."""
+        self._loaded_mtime = self._index_mtime()
+        if self._loaded_mtime is None:
+            return []
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as file:
+                papers = json.load(file)["papers"]
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Error loading paper index: {e}")
+            return []
+        for paper in papers:
+            paper.setdefault("id", paper.get("content_hash") or uuid.uuid4().hex)
+        return papers
+
+    def _set_papers(self, papers):
+        """Replace the papers list and rebuild the lookup tables."""
+        self.papers = papers
+        self.by_hash = {}
+        self.buckets = {}
+        for i, paper in enumerate(self.papers):
+            self._add_to_lookups(i, paper)
+
+    def refresh(self):
+        """Reload the index if another process has written to it since it was last read."""
+        if self.index_path and self._index_mtime() != self._loaded_mtime:
+            self._set_papers(self._merge(self._load_papers()))
+
+    def _words(self, text):
+        """Normalise text to lowercase words, ignoring layout and punctuation."""
+        return re.findall(r'\w+', text.lower())
+
+    def can_fingerprint(self, text):
+        """
+        Check whether a text is long enough to be matched reliably.
+
+        Args:
+            text (str): Extracted paper text
+
+        Returns:
+            bool: True if the text has at least MIN_SHINGLES shingles
+        """
+        return len(self._words(text)) - SHINGLE_SIZE + 1 >= MIN_SHINGLES
+
+    def content_hash(self, text):
+        """
+        Hash the normalised text of a paper.
+
+        Args:
+            text (str): Extracted paper text
+
+        Returns:
+            str: SHA-256 hex digest of the normalised text
+        """
+        return hashlib.sha256(' '.join(self._words(text)).encode('utf-8')).hexdigest()
+
+    def signature(self, text):
+        """
+        Compute the MinHash signature of a paper's word shingles.
+
+        Args:
+            text (str): Extracted paper text
+
+        Returns:
+            list: NUM_BINS integers, _EMPTY_BIN for bins no shingle fell into
+        """
+        words = self._words(text)
+        signature = [_EMPTY_BIN] * NUM_BINS
+        for i in range(len(words) - SHINGLE_SIZE + 1):
+            h = zlib.crc32(' '.join(words[i:i + SHINGLE_SIZE]).encode('utf-8'))
+            b, value = h % NUM_BINS, h // NUM_BINS
+            if signature[b] == _EMPTY_BIN or value < signature[b]:
+                signature[b] = value
+        return signature
+
+    def similarity(self, signature_a, signature_b):
+        """
+        Estimate the Jaccard similarity of two papers from their signatures.
+
+        Only bins filled in at least one signature are compared; bins empty
+        in both say nothing about whether the papers share shingles.
+        """
+        filled = [(x, y) for x, y in zip(signature_a, signature_b) if x != _EMPTY_BIN or y != _EMPTY_BIN]
+        if not filled:
+            return 0
+        return sum(x == y for x, y in filled) / len(filled)
+
+    def _bands(self, signature):
+        """Split a signature into hashable LSH band keys, skipping bands with no filled bins."""
+        bands = []
+        for start in range(0, NUM_BINS, ROWS_PER_BAND):
+            rows = tuple(signature[start:start + ROWS_PER_BAND])
+            if any(row != _EMPTY_BIN for row in rows):
+                bands.append((start, rows))
+        return bands
+
+    def _add_to_lookups(self, i, paper):
+        """Register a paper in the hash and LSH lookup tables."""
+        # Papers too short to fingerprint are kept only for their links
+        if not paper.get("content_hash"):
+            return
+        self.by_hash[paper["content_hash"]] = i
+        for band in self._bands(paper["signature"]):
+            self.buckets.setdefault(band, []).append(i)
+
+    def find_duplicate(self, text):
+        """
+        Find a previously processed paper that matches the given text.
+
+        Texts too short to fingerprint never match.
+
+        Args:
+            text (str): Extracted paper text
+
+        Returns:
+            tuple: (paper, similarity) for the closest match at or above
+                similarity_threshold, or (None, 0) if there is none.
+                Exact matches have similarity 1.0.
+        """
+        if not self.can_fingerprint(text):
+            return None, 0
+        self.refresh()
+
+        i = self.by_hash.get(self.content_hash(text))
+        if i is not None:
+            return self.papers[i], 1.0
+
+        signature = self.signature(text)
+        candidates = set()
+        for band in self._bands(signature):
+            candidates.update(self.buckets.get(band, []))
+
+        best, best_similarity = None, 0
+        for i in candidates:
+            similarity = self.similarity(signature, self.papers[i]["signature"])
+            if similarity >= self.similarity_threshold and similarity > best_similarity:
+                best, best_similarity = self.papers[i], similarity
+        return best, best_similarity
+
+    def add(self, text, pdf_path, script_path=None):
+        """
+        Add a processed paper to the index.
+
+        Args:
+            text (str): Extracted paper text
+            pdf_path (str): Path to the PDF file
+            script_path (str, optional): Path to the generated script
+
+        Returns:
+            dict: The new index entry
+        """
+        fingerprint = self.can_fingerprint(text)
+        paper = {
+            "id": uuid.uuid4().hex,
+            "content_hash": self.content_hash(text) if fingerprint else None,
+            "signature": self.signature(text) if fingerprint else None,
+            "pdf_names": [os.path.basename(pdf_path)],
+            "script_path": script_path,
+            "metadata_path": None,
+            "audio_path": None
+        }
+        self.refresh()
+        self.papers.append(paper)
+        self._add_to_lookups(len(self.papers) - 1, paper)
+        self._dirty[paper["id"]] = paper
+        self.save()
+        return paper
+
+    def add_alias(self, paper, pdf_path):
+        """
+        Record another PDF filename as a copy of an indexed paper.
+
+        Args:
+            paper (dict): Index entry returned by find_duplicate
+            pdf_path (str): Path to the duplicate PDF file
+        """
+        pdf_name = os.path.basename(pdf_path)
+        if pdf_name not in paper["pdf_names"]:
+            paper["pdf_names"].append(pdf_name)
+            self._dirty[paper["id"]] = paper
+            self.save()
+
+    def find_by_pdf(self, pdf_path):
+        """
+        Find the index entry for a PDF filename.
+
+        Args:
+            pdf_path (str): Path to the PDF file
+
+        Returns:
+            dict: The index entry, or None if the PDF has not been processed
+        """
+        self.refresh()
+        pdf_name = os.path.basename(pdf_path)
+        for paper in self.papers:
+            if pdf_name in paper["pdf_names"]:
+                return paper
+        return None
+
+    def find_by_script(self, script_path):
+        """
+        Find the index entry a script was generated for.
+
+        Args:
+            script_path (str): Path to the script file
+
+        Returns:
+            dict: The index entry, or None if the script is not indexed
+        """
+        self.refresh()
+        script_name = os.path.basename(script_path)
+        for paper in self.papers:
+            if paper["script_path"] and os.path.basename(paper["script_path"]) == script_name:
+                return paper
+        return None
+
+    def find_output(self, script_path, kind):
+        """
+        Find output already made for a script that still exists on disk.
+
+        Args:
+            script_path (str): Path to the script file
+            kind (str): "metadata" or "audio"
+
+        Returns:
+            str: Path to the linked output, or None if there is none
+        """
+        paper = self.find_by_script(script_path)
+        output_path = paper and paper[f"{kind}_path"]
+        return output_path if output_path and os.path.exists(output_path) else None
+
+    def link_outputs(self, script_path, metadata_path=None, audio_path=None):
+        """
+        Link metadata or audio to the paper a script was generated from.
+
+        Args:
+            script_path (str): Path to the script file
+            metadata_path (str, optional): Path to the generated metadata
+            audio_path (str, optional): Path to the generated audio
+        """
+        paper = self.find_by_script(script_path)
+        if paper:
+            if metadata_path:
+                paper["metadata_path"] = metadata_path
+            if audio_path:
+                paper["audio_path"] = audio_path
+            self._dirty[paper["id"]] = paper
+            self.save()
+
+    def _merge(self, papers):
+        """Overlay entries changed here onto a papers list read from disk."""
+        merged = {paper["id"]: paper for paper in papers}
+        merged.update(self._dirty)
+        return list(merged.values())
+
+    def save(self):
+        """
+        Write the index to index_path.
+
+        The file is re-read first and entries changed here are merged into
+        it, so entries added by other processes are kept. The result is
+        written to a temporary file and swapped in with os.replace.
+        """
+        if not self.index_path:
+            return
+        papers = self._merge(self._load_papers())
+        try:
+            temp_path = f"{self.index_path}.{os.getpid()}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as file:
+                json.dump({"papers": papers}, file)
+            os.replace(temp_path, self.index_path)
+        except OSError as e:
+            print(f"Error saving paper index: {e}")
+            return
+        self._dirty = {}
+        self._loaded_mtime = self._index_mtime()
+        self._set_papers(papers)
+
+
+_default_index = None
+
+def get_default_index():
+    """
+    Get the paper index shared by all generators in this process.
+
+    Returns:
+        PaperIndex: The shared index
+    """
+    global _default_index
+    if _default_index is None:
+        _default_index = PaperIndex()
+    return _default_index
@@ -1,12 +1,18 @@
 import os
 import sys
 from elevenlabs import ElevenLabs, play, save
+from paper_index import get_default_index
 
 class PodcastGenerator:
     """A class to generate podcast audio from a script using ElevenLabs voices."""
     
-    def __init__(self):
-        """Initialize the PodcastGenerator with ElevenLabs API key and voice IDs."""
+    def __init__(self, print_voices=True):
+        """
+        Initialize the PodcastGenerator with ElevenLabs API key and voice IDs.
+        
+        Args:
+            print_voices (bool): Whether to list the available voices on startup
+        """
         # Initialize ElevenLabs API key
         api_key = os.getenv('ELEVENLABS_API_KEY')
         if not api_key:
@@ -28,7 +34,8 @@ class PodcastGenerator:
         self.output_format = "mp3_44100_128"
         
         # Print available voices for debugging
-        self.print_available_voices()
+        if print_voices:
+            self.print_available_voices()
     
     def print_available_voices(self):
         """Print all available voices from ElevenLabs API."""
@@ -66,6 +73,18 @@ class PodcastGenerator:
             print(f"Error generating audio: {e}")
             return b''
 
+    def split_script(self, script_content):
+        """
+        Split a script into speaker turns.
+        
+        Args:
+            script_content (str): The full script content
+            
+        Returns:
+            list: Non-empty speaker turns, separated by blank lines in the script
+        """
+        return [s.strip() for s in script_content.split('\n\n') if s.strip()]
+
     def generate_podcast(self, script_file_path):
         """
         Generate a podcast audio file from a script.
@@ -86,7 +105,7 @@ class PodcastGenerator:
         
         # Read and split script
         with open(script_file_path, 'r', encoding='utf-8') as file:
-            segments = [s.strip() for s in file.read().split('\n\n') if s.strip()]
+            segments = self.split_script(file.read())
         
         # Create audio directory
         os.makedirs("audio", exist_ok=True)
@@ -136,8 +155,15 @@ def main():
     script_file_path = os.path.join(script_dir, script_files[0])
     print(f"Using script file: {script_file_path}")
     
+    # Pass --force to regenerate audio the paper index already links to
+    existing = get_default_index().find_output(script_file_path, "audio")
+    if existing and "--force" not in sys.argv[1:]:
+        print(f"Audio already exists for this paper: {existing} (pass --force to regenerate)")
+        return
+    
     try:
         output_path = generator.generate_podcast(script_file_path)
+        get_default_index().link_outputs(script_file_path, audio_path=output_path)
         print(f"Podcast saved to: {output_path}")
     except Exception as e:
         print(f"Error: {str(e)}")
@@ -1,9 +1,13 @@
 import os
+import re
+import sys
 import time
 from dotenv import load_dotenv
 from openai import OpenAI
 from PyPDF2 import PdfReader
 import random
+from model_router import get_default_router
+from paper_index import get_default_index
 
 # Load environment variables
 load_dotenv()
@@ -11,14 +15,27 @@ load_dotenv()
 class ScriptGenerator:
     """A class to generate podcast scripts from academic papers using GPT-4."""
     
-    def __init__(self):
-        """Initialize the ScriptGenerator with OpenAI client and system prompt."""
+    def __init__(self, router=None, paper_index=None):
+        """
+        Initialize the ScriptGenerator with OpenAI client and system prompt.
+        
+        Args:
+            router (ModelRouter, optional): Router that picks the model for each
+                segment. Defaults to the router shared across the process.
+            paper_index (PaperIndex, optional): Index of processed papers used to
+                skip duplicates. Defaults to the index shared across the process.
+        """
         # Initialize OpenAI client
         api_key = os.getenv('OPENAI_API_KEY')
         if not api_key:
             raise ValueError("OPENAI_API_KEY not found in environment variables")
         self.client = OpenAI(api_key=api_key)
         
+        # Model and generation parameters are chosen per segment
+        self.router = router or get_default_router()
+        
+        self.paper_index = paper_index or get_default_index()
+        
         # System prompt for GPT-4
         self.system_prompt = """You are a professional podcast script writer for "Talking Machines by Su Park", a podcast specifically designed for women who are curious about AI and technology.
 
@@ -84,12 +101,19 @@ class ScriptGenerator:
             }
         }
 
+        # Length control: a segment shorter than this fraction of its target,
+        # or one cut off by the token cap, gets extended with a continuation
+        # request instead of being regenerated from scratch
+        self.min_word_ratio = 0.85
+        self.max_continuations = 2
+        self.tokens_per_word = 1.4
+
     def extract_text_from_pdf(self, pdf_path):
         """
         Extract text content from a PDF file.
         
         Args:
-            pdf_path (str): Path to the PDF file
+            pdf_path (str or file-like): Path to the PDF file, or a binary stream
             
         Returns:
             str: Extracted text content from the PDF
@@ -158,19 +182,19 @@ class ScriptGenerator:
         
         return first_half, second_half
 
-    def generate_segment(self, segment_name, word_count, pdf_content, conversation_history="", pdf_path=""):
+    def build_segment_message(self, segment_name, word_count, pdf_content, conversation_history="", pdf_path=""):
         """
-        Generate a specific segment of the podcast script.
+        Build the user prompt for a specific segment of the podcast script.
         
         Args:
             segment_name (str): Name of the segment to generate
             word_count (int): Target word count for the segment
             pdf_content (str): Content of the PDF
             conversation_history (str): Previous conversation for context
-            pdf_path (str): Path to the PDF file
+            pdf_path (str): Path or filename of the PDF, used for the closing topic
             
         Returns:
-            str: Generated segment content
+            str: The user message for the segment
         """
         segment_info = self.segments[segment_name]
         
@@ -268,8 +292,7 @@ class ScriptGenerator:
             Ensure the conversation between Vic and Alex remains balanced and engaging throughout.
             
             End with this exact closing message:
-            "Thanks for joining us on Talking Machines today! We hope you enjoyed learning about {topic}. Our goal is not to bore you but fill you in on what's happening in the sci-fi-slowly-becoming-our-reality era we're living in. And today we learned about {topic}.
-            Until next time! You can find us on instagram at talking underscore machines underscore podcast."
+            {self.closing_message(topic)}
             
             IMPORTANT: Do not have the hosts read off or describe their own character traits or backgrounds. They should not mention their accents, where they're from, or their personality traits.
             
@@ -277,23 +300,328 @@ class ScriptGenerator:
             
             Ensure the flow feels natural and engaging."""
 
+        return user_message
+
+    def closing_message(self, topic):
+        """
+        Get the fixed closing message that ends every episode.
+        
+        Args:
+            topic (str): The topic of the episode
+            
+        Returns:
+            str: The quoted closing message
+        """
+        return f"""\"Thanks for joining us on Talking Machines today! We hope you enjoyed learning about {topic}. Our goal is not to bore you but fill you in on what's happening in the sci-fi-slowly-becoming-our-reality era we're living in. And today we learned about {topic}.
+            Until next time! You can find us on instagram at talking underscore machines underscore podcast.\""""
+
+    def build_segment_request(self, user_message):
+        """
+        Build the chat completion arguments for a segment prompt.
+        
+        The model and generation parameters come from the segment's route.
+        
+        Args:
+            user_message (str): The user message for the segment
+            
+        Returns:
+            dict: Request arguments for ModelRouter.complete
+        """
+        return {
+            "messages": [
+                {"role": "system", "content": self.system_prompt},
+                {"role": "user", "content": user_message}
+            ]
+        }
+
+    def generate_segment(self, segment_name, word_count, pdf_content, conversation_history="", pdf_path=""):
+        """
+        Generate a specific segment of the podcast script.
+        
+        Args:
+            segment_name (str): Name of the segment to generate
+            word_count (int): Target word count for the segment
+            pdf_content (str): Content of the PDF
+            conversation_history (str): Previous conversation for context
+            pdf_path (str): Path to the PDF file
+            
+        Returns:
+            str: Generated segment content
+        """
+        steps = self.segment_steps(segment_name, word_count, pdf_content, conversation_history, pdf_path)
         try:
-            response = self.client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": self.system_prompt},
-                    {"role": "user", "content": user_message}
-                ],
-                max_tokens=3000,
-                temperature=0.7,
-                top_p=0.9
-            )
+            route_name, params, request = next(steps)
+            while True:
+                try:
+                    response = self.router.complete(self.client, route_name, params, **request)
+                except Exception as e:
+                    route_name, params, request = steps.throw(e)
+                else:
+                    route_name, params, request = steps.send(response)
+        except StopIteration as done:
+            return done.value
+
+    def report(self, message):
+        """
+        Report progress or a recoverable error.
+        
+        Args:
+            message (str): The message to report
+        """
+        print(message)
+
+    def count_words(self, text):
+        """
+        Count the words in a piece of text.
+        
+        Args:
+            text (str): The text to count
+            
+        Returns:
+            int: Number of whitespace-separated words
+        """
+        return len(text.split())
+
+    def trim_to_last_sentence(self, text):
+        """
+        Drop a trailing sentence fragment left behind by a truncated response.
+        
+        Args:
+            text (str): The text to trim
+            
+        Returns:
+            str: The text ending at its last complete sentence, or the
+                original text if no sentence boundary was found
+        """
+        stripped = text.rstrip()
+        # A sentence ends at . ! or ?, optionally followed by a closing quote,
+        # and then whitespace or the end of the text. This skips decimal
+        # points such as 93.5.
+        sentence_ends = list(re.finditer(r'[.!?]["\']?(?=\s|$)', stripped))
+        if not sentence_ends:
+            return text
+        return stripped[:sentence_ends[-1].end()]
+
+    def trim_partial_word(self, text):
+        """
+        Drop a word that a truncated response may have cut off part-way.
+        
+        Args:
+            text (str): The text to trim
+            
+        Returns:
+            str: The text ending at its last whole word, or the original
+                text if it already ends on whitespace or punctuation
+        """
+        if not text or not text[-1].isalnum():
+            return text
+        last_space = re.search(r'\s\S*$', text)
+        # Keep a text that is a single unbroken word rather than emptying it
+        if not last_space or not text[:last_space.start()].strip():
+            return text
+        return text[:last_space.start()]
+
+    def missing_segment_words(self, segment_name, segment_content, word_count, finish_reason):
+        """
+        Work out how many more words a segment needs, if any.
+        
+        Args:
+            segment_name (str): Name of the segment being generated
+            segment_content (str): The segment generated so far
+            word_count (int): Target word count for the segment
+            finish_reason (str): finish_reason of the last completion
+            
+        Returns:
+            int: Number of words to request, or 0 if the segment needs no
+                continuation (a truncated segment already at its target is
+                trimmed instead)
+        """
+        current_words = self.count_words(segment_content)
+        if finish_reason == "length":
+            if current_words >= word_count:
+                return 0
+        elif current_words >= int(word_count * self.min_word_ratio) or segment_name == "Closing":
+            # A complete Closing already ends with the fixed sign-off, so
+            # anything appended to it would come after the goodbye
+            return 0
+        return max(word_count - current_words, 50)
+
+    def build_continuation_request(self, segment_name, segment_content, missing_words, pdf_path="", pdf_content=""):
+        """
+        Build the chat completion arguments for continuing a segment.
+        
+        The segment description and the end of the dialogue so far are sent
+        instead of the original prompt. The Key Concepts segments also get
+        their half of the paper so the continuation stays grounded in it.
+        
+        Args:
+            segment_name (str): Name of the segment being generated
+            segment_content (str): The segment generated so far
+            missing_words (int): Number of words still needed
+            pdf_path (str): Path or filename of the PDF, used for the closing topic
+            pdf_content (str): Content of the PDF
+            
+        Returns:
+            dict: Request arguments for ModelRouter.complete
+        """
+        source = ""
+        if segment_name in ("Key Concepts Part 1", "Key Concepts Part 2") and pdf_content:
+            first_half, second_half = self.split_pdf_content(pdf_content)
+            paper_half = first_half if segment_name == "Key Concepts Part 1" else second_half
+            source = f"PDF Content:\n        {paper_half}\n        "
+        
+        ending = ""
+        if segment_name == "Closing":
+            topic = self.extract_topic_from_filename(pdf_path)
+            ending = f"End with this exact closing message:\n        {self.closing_message(topic)}"
+        
+        continuation_message = f"""You are writing the "{segment_name}" segment of the podcast script.
+        Segment Description: {self.segments[segment_name]['description']}
+        
+        {source}The segment so far ends with:
+        {self.extract_last_words(segment_content, 300)}
+        
+        Continue the dialogue exactly where it stopped, without repeating anything already written.
+        If the last sentence is unfinished, finish it first.
+        Write approximately {missing_words} more words.
+        {ending}
+        
+        Format the dialogue naturally, without using speaker labels like 'Vic:' or 'Alex:'. Instead, write each line of dialogue on its own line with a blank line between speakers.
+        Do not add any preamble or commentary - output only the continuation of the dialogue."""
+        
+        return {
+            "messages": [
+                {"role": "system", "content": self.system_prompt},
+                {"role": "user", "content": continuation_message}
+            ],
+            "max_tokens": int(missing_words * self.tokens_per_word) + 200
+        }
+
+    def join_continuation(self, segment_content, continuation, truncated):
+        """
+        Append a continuation to a partial segment.
+        
+        Args:
+            segment_content (str): The segment generated so far
+            continuation (str): The newly generated continuation
+            truncated (bool): Whether the segment was cut off mid-sentence,
+                in which case it should already have been cut back to a whole
+                word with trim_partial_word
+            
+        Returns:
+            str: The combined segment
+        """
+        # A continuation that starts a new speaker turn keeps its paragraph
+        # break; one that finishes a cut-off sentence is joined inline
+        separator = " " if truncated else "\n\n"
+        return segment_content.rstrip() + separator + continuation
+
+    def continuation_route(self, segment_name):
+        """
+        Get the route that continuation requests for a segment are recorded under.
+        
+        Continuations are much shorter than full segments, so they are kept
+        out of the segment's own latency and cost averages.
+        
+        Args:
+            segment_name (str): Name of the segment being continued
+            
+        Returns:
+            str: The continuation route name
+        """
+        return f"{segment_name} (continuation)"
+
+    def segment_steps(self, segment_name, word_count, pdf_content, conversation_history="", pdf_path=""):
+        """
+        Run the request sequence for one segment, including length fixes.
+        
+        This generator holds all of the segment logic but sends no requests
+        itself. It yields (route_name, params, request) tuples, and the caller
+        sends back each response, or throws in the exception the request
+        raised. The finished segment is the generator's return value. This
+        lets the blocking and asyncio generators share one implementation.
+        
+        A segment that comes back short or truncated is extended by asking
+        the model to carry on from where it stopped, with max_tokens sized to
+        the missing words only, instead of regenerating it. A segment cut off
+        after reaching its target is trimmed to its last complete sentence.
+        
+        Args:
+            segment_name (str): Name of the segment to generate
+            word_count (int): Target word count for the segment
+            pdf_content (str): Content of the PDF
+            conversation_history (str): Previous conversation for context
+            pdf_path (str): Path or filename of the PDF, used for the closing topic
             
-            return response.choices[0].message.content
+        Yields:
+            tuple: (route_name, params, request) for ModelRouter.complete
             
+        Returns:
+            str: Generated segment content, or "" if the segment request failed
+        """
+        user_message = self.build_segment_message(
+            segment_name, word_count, pdf_content, conversation_history, pdf_path
+        )
+        
+        # Choose the model up front so continuations can stay on it
+        params = self.router.choose(segment_name)
+        
+        try:
+            response = yield segment_name, params, self.build_segment_request(user_message)
         except Exception as e:
-            print(f"Error generating segment '{segment_name}': {e}")
+            self.report(f"Error generating segment '{segment_name}': {e}")
             return ""
+        
+        choice = response.choices[0]
+        segment_content = choice.message.content or ""
+        finish_reason = choice.finish_reason
+        
+        for attempt in range(self.max_continuations):
+            missing_words = self.missing_segment_words(segment_name, segment_content, word_count, finish_reason)
+            if not missing_words:
+                break
+            
+            truncated = finish_reason == "length"
+            if truncated:
+                segment_content = self.trim_partial_word(segment_content)
+            reason = "truncated" if truncated else "short"
+            self.report(f"Segment '{segment_name}' is {reason} ({self.count_words(segment_content)}/{word_count} words), "
+                        f"requesting ~{missing_words} more words...")
+            
+            try:
+                response = yield (
+                    self.continuation_route(segment_name),
+                    params,
+                    self.build_continuation_request(segment_name, segment_content, missing_words, pdf_path, pdf_content)
+                )
+            except Exception as e:
+                self.report(f"Error continuing segment '{segment_name}': {e}")
+                break
+            
+            choice = response.choices[0]
+            continuation = (choice.message.content or "").strip()
+            finish_reason = choice.finish_reason
+            if not continuation:
+                break
+            
+            segment_content = self.join_continuation(segment_content, continuation, truncated)
+        
+        if finish_reason == "length":
+            segment_content = self.trim_to_last_sentence(segment_content)
+        
+        return segment_content
+
+    def detect_first_speaker(self, script):
+        """
+        Determine the first speaker by checking who introduces themselves first.
+        
+        Args:
+            script (str): The generated script
+            
+        Returns:
+            str: "Vic" or "Alex"
+        """
+        return "Vic" if "I'm Vic" in script else "Alex"
 
     def clean_filename(self, filename):
         """
@@ -312,19 +640,47 @@ class ScriptGenerator:
         # Replace spaces with underscores
         return name.replace(' ', '_')
 
-    def generate_full_script(self, pdf_path):
+    def generate_full_script(self, pdf_path, force=False, reuse_near=False):
         """
         Generate the complete podcast script in segments.
         
+        If the paper is an exact duplicate of one already processed, the
+        existing script is reused instead. Near duplicates, such as revised
+        versions, are reported and only reused when reuse_near is set.
+        
         Args:
             pdf_path (str): Path to the PDF file
+            force (bool): Generate a new script even for a duplicate paper
+            reuse_near (bool): Also reuse the script of a near-duplicate paper
             
         Returns:
             tuple: (complete_script, output_path)
+            
+        Raises:
+            ValueError: If a segment could not be generated; nothing is saved
         """
         # Extract text from PDF
         pdf_content = self.extract_text_from_pdf(pdf_path)
         
+        if not force:
+            paper, similarity = self.paper_index.find_duplicate(pdf_content)
+            if paper and paper["script_path"] and os.path.exists(paper["script_path"]):
+                if similarity == 1.0 or reuse_near:
+                    match = "an exact" if similarity == 1.0 else f"a near ({similarity:.0%} similar)"
+                    print(f"\n'{pdf_path}' is {match} duplicate of '{paper['pdf_names'][0]}', "
+                          f"reusing script: {paper['script_path']}")
+                    for kind in ("metadata", "audio"):
+                        output_path = self.paper_index.find_output(paper["script_path"], kind)
+                        if output_path:
+                            print(f"Existing {kind}: {output_path}")
+                    self.paper_index.add_alias(paper, pdf_path)
+                    with open(paper["script_path"], 'r', encoding='utf-8') as f:
+                        return f.read(), paper["script_path"]
+                
+                print(f"\n'{pdf_path}' looks like a revision of '{paper['pdf_names'][0]}' "
+                      f"({similarity:.0%} similar, script: {paper['script_path']}). "
+                      f"Generating a new script; pass --reuse-near to reuse the previous one.")
+        
         # Store the complete script and conversation history
         complete_script = ""
         conversation_history = ""
@@ -342,6 +698,11 @@ class ScriptGenerator:
                 pdf_path
             )
             
+            # A script with a missing segment must not be saved or indexed,
+            # or the paper would be treated as done
+            if not segment_content:
+                raise ValueError(f"Segment '{segment_name}' could not be generated")
+            
             end_time = time.time()
             print(f"Segment '{segment_name}' generated in {end_time - start_time:.2f} seconds")
             
@@ -352,8 +713,7 @@ class ScriptGenerator:
             # Add a delay to avoid hitting rate limits
             time.sleep(3)
         
-        # Determine first speaker by checking who introduces themselves first
-        first_speaker = "Vic" if "I'm Vic" in complete_script else "Alex"
+        first_speaker = self.detect_first_speaker(complete_script)
         pdf_name = self.clean_filename(os.path.basename(pdf_path))
         output_path = f"scripts/{pdf_name}_{first_speaker}_first.txt"
         
@@ -361,6 +721,8 @@ class ScriptGenerator:
         with open(output_path, "w", encoding="utf-8") as f:
             f.write(complete_script)
         
+        self.paper_index.add(pdf_content, pdf_path, output_path)
+        
         return complete_script, output_path
 
 def main():
@@ -387,7 +749,13 @@ def main():
     print(f"Using PDF file: {pdf_path}")
     
     try:
-        script, output_path = generator.generate_full_script(pdf_path)
+        # Pass --force to regenerate a paper that has already been processed,
+        # or --reuse-near to reuse the script of a revised version
+        script, output_path = generator.generate_full_script(
+            pdf_path,
+            force="--force" in sys.argv[1:],
+            reuse_near="--reuse-near" in sys.argv[1:]
+        )
         print(f"\nScript generated successfully! Saved to: {output_path}")
         print("\nPreview of the generated script:")
         print(script[:500] + "...")  # Show first 500 characters
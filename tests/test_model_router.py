@@ -0,0 +1,96 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from model_router import ModelRouter
+
+
+def make_router(tmp_path, **kwargs):
+    return ModelRouter(config_path=None, stats_path=str(tmp_path / "routing_stats.json"), **kwargs)
+
+
+def test_over_budget_candidate_is_reprobed(tmp_path):
+    router = make_router(tmp_path)
+    router.random.seed(0)
+    for _ in range(3):
+        router.record("Key Concepts Part 1", "gpt-4o", 120, 2000, 1500)
+
+    chosen = [router.choose("Key Concepts Part 1")["model"] for _ in range(200)]
+
+    assert chosen.count("gpt-4o-mini") > chosen.count("gpt-4o") > 0
+
+
+def test_recovers_after_latency_spike(tmp_path):
+    router = make_router(tmp_path)
+    for _ in range(3):
+        router.record("Key Concepts Part 1", "gpt-4o", 120, 2000, 1500)
+    for _ in range(5):
+        router.record("Key Concepts Part 1", "gpt-4o", 30, 2000, 1500)
+
+    router.exploration_rate = 0
+    assert router.choose("Key Concepts Part 1")["model"] == "gpt-4o"
+
+
+def test_failure_does_not_seed_latency_or_cost(tmp_path):
+    router = make_router(tmp_path)
+    router.record("Closing", "gpt-4o-mini", 0.05, failed=True)
+    router.record("Closing", "gpt-4o-mini", 10, 1000, 200)
+
+    stats = router.stats["Closing"]["gpt-4o-mini"]
+    assert stats["calls"] == 2
+    assert stats["latency"] == 10
+    assert stats["completion_tokens"] == 200
+    assert stats["cost"] > 0
+    assert 0 < stats["failure_rate"] < 1
+
+
+def test_save_merges_with_other_processes(tmp_path):
+    first = make_router(tmp_path)
+    second = make_router(tmp_path)
+    first.record("Closing", "gpt-4o-mini", 5, 100, 100)
+    second.record("Episode Title", "gpt-4o-mini", 1, 100, 10)
+
+    first.save_stats()
+    second.save_stats()
+
+    saved = make_router(tmp_path).stats
+    assert "Closing" in saved and "Episode Title" in saved
+    assert "Closing" in second.stats
+
+
+def test_save_combines_observations_of_the_same_entry(tmp_path):
+    first = make_router(tmp_path)
+    second = make_router(tmp_path)
+    for _ in range(3):
+        first.record("Closing", "gpt-4o-mini", 10, 100, 100)
+    second.record("Closing", "gpt-4o-mini", 50, 100, 100)
+
+    first.save_stats()
+    second.save_stats()
+
+    saved = make_router(tmp_path).stats["Closing"]["gpt-4o-mini"]
+    assert saved["calls"] == 4
+    assert saved["successes"] == 4
+    assert saved["latency"] == 20
+
+
+def test_repeated_saves_do_not_double_count(tmp_path):
+    router = make_router(tmp_path)
+    router.record("Closing", "gpt-4o-mini", 10, 100, 100)
+    router.save_stats()
+    router.record("Closing", "gpt-4o-mini", 10, 100, 100)
+    router.save_stats()
+
+    assert make_router(tmp_path).stats["Closing"]["gpt-4o-mini"]["calls"] == 2
+
+
+def test_fallback_is_least_over_the_failed_budget(tmp_path):
+    router = make_router(tmp_path)
+    router.exploration_rate = 0
+    for _ in range(3):
+        # gpt-4o is faster but far over max_cost; gpt-4o-mini is only just over max_latency
+        router.record("Key Concepts Part 1", "gpt-4o", 20, 20000, 20000)
+        router.record("Key Concepts Part 1", "gpt-4o-mini", 100, 2000, 1500)
+
+    assert router.choose("Key Concepts Part 1")["model"] == "gpt-4o-mini"
@@ -0,0 +1,106 @@
+import os
+import sys
+import random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from paper_index import PaperIndex
+
+VOCABULARY = [f"word{i}" for i in range(2000)]
+
+
+def paper_text(seed, num_words=3000):
+    rng = random.Random(seed)
+    return ' '.join(rng.choice(VOCABULARY) for _ in range(num_words))
+
+
+def revise(text, every=100):
+    words = text.split()
+    for i in range(0, len(words), every):
+        words[i] = "revised"
+    return ' '.join(words)
+
+
+def make_index(tmp_path):
+    return PaperIndex(index_path=str(tmp_path / "paper_index.json"))
+
+
+def test_empty_text_is_never_a_duplicate(tmp_path):
+    index = make_index(tmp_path)
+    index.add("\n\n\n", "scanned.pdf", "scripts/scanned.txt")
+
+    assert index.find_duplicate("\n\n\n") == (None, 0)
+    assert index.find_duplicate("Figure 1") == (None, 0)
+    assert index.find_by_pdf("scanned.pdf")["script_path"] == "scripts/scanned.txt"
+
+
+def test_short_texts_are_not_near_duplicates(tmp_path):
+    index = make_index(tmp_path)
+    index.add("Attention is all you need transformer", "attention.pdf", "scripts/attention.txt")
+
+    assert index.find_duplicate("BERT pretraining of deep bidirectional") == (None, 0)
+
+
+def test_exact_duplicate_ignores_layout(tmp_path):
+    index = make_index(tmp_path)
+    text = paper_text(1)
+    index.add(text, "paper.pdf", "scripts/paper.txt")
+
+    paper, similarity = index.find_duplicate(text.upper().replace(' ', '\n'))
+
+    assert similarity == 1.0
+    assert paper["script_path"] == "scripts/paper.txt"
+
+
+def test_revision_is_a_near_duplicate(tmp_path):
+    index = make_index(tmp_path)
+    text = paper_text(1)
+    index.add(text, "paper.pdf", "scripts/paper.txt")
+
+    paper, similarity = index.find_duplicate(revise(text))
+
+    assert paper is not None
+    assert index.similarity_threshold <= similarity < 1.0
+
+
+def test_unrelated_paper_is_not_a_duplicate(tmp_path):
+    index = make_index(tmp_path)
+    index.add(paper_text(1), "paper.pdf", "scripts/paper.txt")
+
+    assert index.find_duplicate(paper_text(2)) == (None, 0)
+
+
+def test_similarity_ignores_bins_empty_in_both():
+    index = PaperIndex(index_path=None)
+    empty = [-1] * 64
+
+    assert index.similarity(empty, empty) == 0
+    assert index.similarity([5] + [-1] * 63, [5] + [-1] * 63) == 1.0
+    assert index.similarity([5, 6] + [-1] * 62, [5, 7] + [-1] * 62) == 0.5
+
+
+def test_save_keeps_entries_from_other_processes(tmp_path):
+    daemon = make_index(tmp_path)
+    cli = make_index(tmp_path)
+
+    daemon.add(paper_text(1), "first.pdf", "scripts/first.txt")
+    cli.add(paper_text(2), "second.pdf", "scripts/second.txt")
+    cli.link_outputs("scripts/first.txt", metadata_path="metadata/first_metadata.txt")
+
+    assert daemon.find_by_pdf("second.pdf") is not None
+    assert daemon.find_by_pdf("first.pdf")["metadata_path"] == "metadata/first_metadata.txt"
+    reloaded = make_index(tmp_path)
+    assert sorted(name for paper in reloaded.papers for name in paper["pdf_names"]) == ["first.pdf", "second.pdf"]
+
+
+def test_linked_outputs_are_found_while_they_exist(tmp_path):
+    index = make_index(tmp_path)
+    audio_path = tmp_path / "paper.mp3"
+    index.add(paper_text(1), "paper.pdf", "scripts/paper_Vic_first.txt")
+    index.link_outputs("scripts/paper_Vic_first.txt", audio_path=str(audio_path))
+
+    assert index.find_output("scripts/paper_Vic_first.txt", "audio") is None
+    audio_path.write_bytes(b"mp3")
+    assert index.find_output("scripts/paper_Vic_first.txt", "audio") == str(audio_path)
+    assert index.find_output("scripts/paper_Vic_first.txt", "metadata") is None
+    assert index.find_output("scripts/other_Vic_first.txt", "audio") is None
@@ -0,0 +1,125 @@
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from script_generator import ScriptGenerator
+from model_router import ModelRouter
+from paper_index import PaperIndex
+
+
+def make_response(content, finish_reason="stop"):
+    return SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content=content), finish_reason=finish_reason)],
+        usage=SimpleNamespace(prompt_tokens=10, completion_tokens=10)
+    )
+
+
+class FakeClient:
+    """Stands in for the OpenAI client, returning queued responses in order."""
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.requests = []
+        self.chat = SimpleNamespace(completions=self)
+
+    def create(self, **request):
+        self.requests.append(request)
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+
+@pytest.fixture
+def generator(tmp_path, monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    router = ModelRouter(config_path=None, stats_path=None)
+    return ScriptGenerator(router=router, paper_index=PaperIndex(index_path=None))
+
+
+def words(n):
+    return ' '.join(["word"] * n)
+
+
+def test_complete_segment_needs_nothing(generator):
+    assert generator.missing_segment_words("Key Concepts Part 1", words(900), 1000, "stop") == 0
+
+
+def test_short_segment_asks_for_the_gap(generator):
+    assert generator.missing_segment_words("Key Concepts Part 1", words(400), 1000, "stop") == 600
+
+
+def test_truncated_segment_over_target_is_not_continued(generator):
+    assert generator.missing_segment_words("Key Concepts Part 1", words(2000), 1000, "length") == 0
+
+
+def test_truncated_segment_under_target_is_continued(generator):
+    assert generator.missing_segment_words("Key Concepts Part 1", words(950), 1000, "length") == 50
+
+
+def test_short_complete_closing_is_left_alone(generator):
+    assert generator.missing_segment_words("Closing", words(20), 100, "stop") == 0
+
+
+def test_trim_keeps_decimal_numbers(generator):
+    text = "It worked well. Accuracy rose to 93.5"
+    assert generator.trim_to_last_sentence(text) == "It worked well."
+
+
+def test_trim_keeps_closing_quote(generator):
+    assert generator.trim_to_last_sentence('She said "wow!" and then') == 'She said "wow!"'
+
+
+def test_trim_without_sentence_end_returns_text(generator):
+    assert generator.trim_to_last_sentence("no sentence end here") == "no sentence end here"
+
+
+def test_partial_word_is_dropped_before_continuing(generator):
+    text = generator.trim_partial_word("and the transfor")
+    assert generator.join_continuation(text, "transformers work.", True) == "and the transformers work."
+
+
+def test_text_ending_on_punctuation_is_not_trimmed(generator):
+    assert generator.trim_partial_word("It works.") == "It works."
+
+
+def test_complete_turn_is_joined_as_new_paragraph(generator):
+    assert generator.join_continuation("It works.\n", "Really?", False) == "It works.\n\nReally?"
+
+
+def test_truncated_segment_is_continued_mid_sentence(generator):
+    generator.client = FakeClient([
+        make_response(words(500) + " and the transfor", "length"),
+        make_response("transformers work. " + words(400), "stop")
+    ])
+
+    segment = generator.generate_segment("Key Concepts Part 1", 1000, "first half\n\nsecond half", "", "paper.pdf")
+
+    assert "and the transformers work." in segment
+    continuation_prompt = generator.client.requests[1]["messages"][-1]["content"]
+    assert "first half" in continuation_prompt
+    assert "second half" not in continuation_prompt
+    assert generator.client.requests[1]["model"] == generator.client.requests[0]["model"]
+
+
+def test_failed_segment_returns_empty(generator):
+    generator.client = FakeClient([RuntimeError("outage")])
+    assert generator.generate_segment("Closing", 100, "paper", "", "paper.pdf") == ""
+
+
+def test_script_with_failed_segment_is_not_saved(generator, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    os.makedirs("scripts")
+    monkeypatch.setattr(generator, "extract_text_from_pdf", lambda pdf_path: "paper text")
+    monkeypatch.setattr("script_generator.time.sleep", lambda seconds: None)
+    generator.client = FakeClient([make_response("Vic: " + words(400)), RuntimeError("outage")])
+
+    with pytest.raises(ValueError):
+        generator.generate_full_script("pdfs/paper.pdf")
+
+    assert os.listdir("scripts") == []
+    assert generator.paper_index.papers == []
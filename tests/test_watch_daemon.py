@@ -0,0 +1,115 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import watch_daemon
+from paper_index import PaperIndex
+
+
+class FakeScriptGenerator:
+    """Writes a placeholder script instead of calling the API."""
+
+    def __init__(self):
+        self.paper_index = PaperIndex(index_path=None)
+        self.fail = False
+
+    def clean_filename(self, filename):
+        return os.path.splitext(filename)[0]
+
+    def generate_full_script(self, pdf_path, reuse_near=False):
+        if self.fail:
+            raise RuntimeError("outage")
+        output_path = f"scripts/{self.clean_filename(os.path.basename(pdf_path))}_Vic_first.txt"
+        with open(output_path, "w", encoding="utf-8") as f:
+            f.write("Vic: Hello.")
+        return "Vic: Hello.", output_path
+
+
+class FakeMetadataGenerator:
+    def generate_metadata(self, script_path):
+        return "Title", "Description"
+
+    def save_metadata(self, title, description, output_file):
+        with open(output_file, "w", encoding="utf-8") as f:
+            f.write(f"{title}\n{description}")
+
+
+class FakePodcastGenerator:
+    def generate_podcast(self, script_path):
+        output_path = os.path.join("audio", os.path.basename(script_path).replace('.txt', '.mp3'))
+        with open(output_path, "wb") as f:
+            f.write(b"mp3")
+        return output_path
+
+
+@pytest.fixture
+def daemon(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(watch_daemon, "ScriptGenerator", FakeScriptGenerator)
+    monkeypatch.setattr(watch_daemon, "EpisodeMetadataGenerator", FakeMetadataGenerator)
+    monkeypatch.setattr(watch_daemon, "PodcastGenerator", FakePodcastGenerator)
+    return watch_daemon.PipelineDaemon(settle_time=2)
+
+
+def write(path, content="x"):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(content)
+
+
+def test_pdf_with_script_is_not_pending(daemon):
+    write("pdfs/paper.pdf")
+    assert daemon.is_pending_pdf("pdfs/paper.pdf")
+
+    write("scripts/paper_Alex_first.txt")
+    assert not daemon.is_pending_pdf("pdfs/paper.pdf")
+
+
+def test_pdf_matched_as_duplicate_is_not_pending(daemon):
+    write("pdfs/copy.pdf")
+    write("scripts/original_Vic_first.txt")
+    daemon.script_generator.paper_index.add("", "pdfs/copy.pdf", "scripts/original_Vic_first.txt")
+
+    assert not daemon.is_pending_pdf("pdfs/copy.pdf")
+
+
+def test_script_is_pending_until_metadata_and_audio_exist(daemon):
+    write("scripts/paper_Vic_first.txt")
+    assert daemon.is_pending_script("scripts/paper_Vic_first.txt")
+
+    write("metadata/paper_Vic_first_metadata.txt")
+    assert daemon.is_pending_script("scripts/paper_Vic_first.txt")
+
+    write("audio/paper_Vic_first.mp3")
+    assert not daemon.is_pending_script("scripts/paper_Vic_first.txt")
+
+
+def test_new_script_is_processed_in_the_same_pass(daemon):
+    write("pdfs/paper.pdf")
+    os.utime("pdfs/paper.pdf", (0, 0))
+
+    daemon.process_pending(daemon.settle_time)
+
+    assert os.path.exists("metadata/paper_Vic_first_metadata.txt")
+    assert os.path.exists("audio/paper_Vic_first.mp3")
+
+
+def test_failed_file_is_retried_only_once_changed(daemon):
+    write("pdfs/paper.pdf")
+    os.utime("pdfs/paper.pdf", (0, 0))
+    daemon.script_generator.fail = True
+
+    daemon.process_pending(daemon.settle_time)
+    assert daemon.pending_pdfs(daemon.settle_time) == []
+
+    daemon.script_generator.fail = False
+    os.utime("pdfs/paper.pdf", (10, 10))
+    assert daemon.pending_pdfs(daemon.settle_time) == [os.path.join("pdfs", "paper.pdf")]
+
+
+def test_unsettled_file_is_skipped(daemon):
+    write("pdfs/paper.pdf")
+    assert daemon.pending_pdfs(daemon.settle_time) == []
+    assert daemon.pending_pdfs(0) == [os.path.join("pdfs", "paper.pdf")]
@@ -0,0 +1,273 @@
+import os
+import sys
+import time
+import argparse
+from script_generator import ScriptGenerator
+from metadata_generator import EpisodeMetadataGenerator
+from podcast_generator import PodcastGenerator
+
+try:
+    from inotify_simple import INotify, flags
+except ImportError:  # inotify is Linux-only; fall back to polling elsewhere
+    INotify = None
+
+
+class PipelineDaemon:
+    """A long-running process that watches pdfs/ and scripts/ and runs new files through the pipeline."""
+
+    def __init__(self, poll_interval=5, settle_time=2, reuse_near=False):
+        """
+        Initialize the PipelineDaemon and its generators.
+
+        The generators, and the API clients they hold, are created once and
+        reused for every episode the daemon processes.
+
+        Args:
+            poll_interval (float): Seconds between directory scans
+            settle_time (float): Seconds a file found by a directory scan must go
+                unmodified before it is treated as fully written
+            reuse_near (bool): Reuse the script of a near-duplicate paper, such
+                as a revised version, instead of generating a new one
+        """
+        self.pdf_dir = "pdfs"
+        self.script_dir = "scripts"
+        self.metadata_dir = "metadata"
+        self.audio_dir = "audio"
+        for directory in (self.pdf_dir, self.script_dir, self.metadata_dir, self.audio_dir):
+            os.makedirs(directory, exist_ok=True)
+
+        self.poll_interval = poll_interval
+        self.settle_time = settle_time
+        self.reuse_near = reuse_near
+
+        self.script_generator = ScriptGenerator()
+        self.metadata_generator = EpisodeMetadataGenerator()
+        self.podcast_generator = PodcastGenerator()
+
+        # Files that failed, keyed by path, with the mtime they failed at.
+        # They are retried only once they change on disk.
+        self.failed = {}
+
+    def _list_files(self, directory, extension, settle_time):
+        """List files in a directory that have finished being written."""
+        now = time.time()
+        paths = []
+        for name in sorted(os.listdir(directory)):
+            if not name.lower().endswith(extension):
+                continue
+            path = os.path.join(directory, name)
+            try:
+                mtime = os.path.getmtime(path)
+            except OSError:
+                continue
+            if now - mtime < settle_time or self.failed.get(path) == mtime:
+                continue
+            paths.append(path)
+        return paths
+
+    def script_paths_for_pdf(self, pdf_path):
+        """
+        Get the possible script paths for a PDF.
+
+        Args:
+            pdf_path (str): Path to the PDF file
+
+        Returns:
+            list: Script paths for either first speaker
+        """
+        pdf_name = self.script_generator.clean_filename(os.path.basename(pdf_path))
+        return [os.path.join(self.script_dir, f"{pdf_name}_{speaker}_first.txt") for speaker in ("Vic", "Alex")]
+
+    def metadata_path_for_script(self, script_path):
+        """Get the metadata output path for a script."""
+        script_name = os.path.splitext(os.path.basename(script_path))[0]
+        return os.path.join(self.metadata_dir, f"{script_name}_metadata.txt")
+
+    def audio_path_for_script(self, script_path):
+        """Get the audio output path for a script."""
+        return os.path.join(self.audio_dir, os.path.basename(script_path).replace('.txt', '.mp3'))
+
+    def pending_pdfs(self, settle_time=0):
+        """
+        Find PDFs that do not have a script yet.
+
+        Args:
+            settle_time (float): Seconds a file must go unmodified to be included
+
+        Returns:
+            list: Paths of PDFs to process
+        """
+        return [path for path in self._list_files(self.pdf_dir, '.pdf', settle_time) if self.is_pending_pdf(path)]
+
+    def is_pending_pdf(self, pdf_path):
+        """Check whether a PDF still needs a script."""
+        return (
+            not any(os.path.exists(p) for p in self.script_paths_for_pdf(pdf_path))
+            and not self._has_indexed_script(pdf_path)
+        )
+
+    def _has_indexed_script(self, pdf_path):
+        """Check whether a PDF was matched to an existing script as a duplicate."""
+        paper = self.script_generator.paper_index.find_by_pdf(pdf_path)
+        return bool(paper and paper["script_path"] and os.path.exists(paper["script_path"]))
+
+    def pending_scripts(self, settle_time=0):
+        """
+        Find scripts that are missing their metadata or audio.
+
+        Args:
+            settle_time (float): Seconds a file must go unmodified to be included
+
+        Returns:
+            list: Paths of scripts to process
+        """
+        return [path for path in self._list_files(self.script_dir, '.txt', settle_time) if self.is_pending_script(path)]
+
+    def is_pending_script(self, script_path):
+        """Check whether a script is missing its metadata or audio."""
+        return (
+            not os.path.exists(self.metadata_path_for_script(script_path))
+            or not os.path.exists(self.audio_path_for_script(script_path))
+        )
+
+    def _mark_failed(self, path):
+        """Remember a failed file so it is not retried until it changes."""
+        try:
+            self.failed[path] = os.path.getmtime(path)
+        except OSError:
+            pass
+
+    def process_pdf(self, pdf_path):
+        """
+        Generate the script for a new PDF.
+
+        Args:
+            pdf_path (str): Path to the PDF file
+
+        Returns:
+            str: Path to the script, or None if generation failed
+        """
+        print(f"\nNew PDF: {pdf_path}")
+        try:
+            _, output_path = self.script_generator.generate_full_script(pdf_path, reuse_near=self.reuse_near)
+            print(f"Script saved to: {output_path}")
+            return output_path
+        except Exception as e:
+            print(f"Error generating script for '{pdf_path}': {e}")
+            self._mark_failed(pdf_path)
+            return None
+
+    def process_script(self, script_path):
+        """
+        Generate whichever of metadata and audio are missing for a script.
+
+        Args:
+            script_path (str): Path to the script file
+        """
+        print(f"\nNew script: {script_path}")
+        try:
+            metadata_path = self.metadata_path_for_script(script_path)
+            if not os.path.exists(metadata_path):
+                title, description = self.metadata_generator.generate_metadata(script_path)
+                self.metadata_generator.save_metadata(title, description, metadata_path)
+                self.script_generator.paper_index.link_outputs(script_path, metadata_path=metadata_path)
+
+            if not os.path.exists(self.audio_path_for_script(script_path)):
+                audio_path = self.podcast_generator.generate_podcast(script_path)
+                self.script_generator.paper_index.link_outputs(script_path, audio_path=audio_path)
+        except Exception as e:
+            print(f"Error processing script '{script_path}': {e}")
+            self._mark_failed(script_path)
+
+    def process_pending(self, settle_time=0):
+        """
+        Run every pending file through the rest of the pipeline.
+
+        Scripts written for new PDFs are passed straight on, since they are
+        known to be complete and would not yet pass settle_time.
+
+        Args:
+            settle_time (float): Seconds a file must go unmodified to be included
+        """
+        processed = set()
+        for pdf_path in self.pending_pdfs(settle_time):
+            script_path = self.process_pdf(pdf_path)
+            if script_path and self.is_pending_script(script_path):
+                self.process_script(script_path)
+                processed.add(script_path)
+        for script_path in self.pending_scripts(settle_time):
+            if script_path not in processed:
+                self.process_script(script_path)
+
+    def process_written(self, path):
+        """
+        Process a single file that inotify reported as fully written.
+
+        Args:
+            path (str): Path to a file in pdfs/ or scripts/
+        """
+        directory = os.path.dirname(path)
+        if directory == self.pdf_dir and path.lower().endswith('.pdf') and self.is_pending_pdf(path):
+            self.process_pdf(path)
+        elif directory == self.script_dir and path.endswith('.txt') and self.is_pending_script(path):
+            self.process_script(path)
+
+    def watch_inotify(self):
+        """Process files as soon as inotify reports them fully written."""
+        inotify = INotify()
+        watch_flags = flags.CLOSE_WRITE | flags.MOVED_TO
+        directories = {
+            inotify.add_watch(self.pdf_dir, watch_flags): self.pdf_dir,
+            inotify.add_watch(self.script_dir, watch_flags): self.script_dir
+        }
+
+        while True:
+            events = inotify.read(timeout=int(self.poll_interval * 1000))
+            if events:
+                # Only the files named in events are known to be complete
+                for event in events:
+                    if event.name:
+                        self.process_written(os.path.join(directories[event.wd], event.name))
+            else:
+                # Rescan when idle so changed files that failed earlier are retried
+                self.process_pending(self.settle_time)
+
+    def watch_polling(self):
+        """Process files by rescanning the directories every poll_interval seconds."""
+        while True:
+            time.sleep(self.poll_interval)
+            self.process_pending(self.settle_time)
+
+    def run(self, use_inotify=True):
+        """
+        Process anything already waiting, then watch for new files forever.
+
+        Args:
+            use_inotify (bool): Use inotify when available instead of polling
+        """
+        self.process_pending(self.settle_time)
+
+        if use_inotify and INotify is not None:
+            print(f"\nWatching '{self.pdf_dir}' and '{self.script_dir}' with inotify...")
+            self.watch_inotify()
+        else:
+            print(f"\nPolling '{self.pdf_dir}' and '{self.script_dir}' every {self.poll_interval} seconds...")
+            self.watch_polling()
+
+def main():
+    """Main function to run the pipeline as a watch daemon."""
+    parser = argparse.ArgumentParser(description="Watch pdfs/ and scripts/ and generate episodes as files arrive.")
+    parser.add_argument("--poll", action="store_true", help="Poll the directories instead of using inotify")
+    parser.add_argument("--interval", type=float, default=5, help="Seconds between directory scans")
+    parser.add_argument("--reuse-near", action="store_true", help="Reuse the script of a near-duplicate paper")
+    args = parser.parse_args()
+
+    daemon = PipelineDaemon(poll_interval=args.interval, reuse_near=args.reuse_near)
+    try:
+        daemon.run(use_inotify=not args.poll)
+    except KeyboardInterrupt:
+        print("\nStopping watch daemon.")
+        sys.exit(0)
+
+if __name__ == "__main__":
+    main()